@@ -3,25 +3,42 @@ Authentication utilities for password hashing and verification
 Version: 3.0 - Using bcrypt directly
 """
 
+import os
 import bcrypt
 from typing import Optional
 from fastapi import Cookie, HTTPException, status
 
+# bcrypt work factor - each +1 doubles hashing time (12 is ~250ms on typical
+# hardware). Existing hashes keep the cost they were created with
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt (CPU-bound - call off the event loop)"""
     # Convert password to bytes
     password_bytes = password.encode('utf-8')
     # Generate salt and hash
-    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
     # Return as string
     return hashed.decode('utf-8')
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a bcrypt hash"""
+# Checked against when the username doesn't exist, so an unknown user takes
+# as long to reject as a wrong password
+_DUMMY_HASH = bcrypt.hashpw(b'unused', bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """Verify a password against a bcrypt hash (CPU-bound - call off the event loop)
+
+    bcrypt.checkpw compares in constant time. Pass None for an unknown user
+    to do the same work and return False.
+    """
     # Convert both to bytes
     password_bytes = plain_password.encode('utf-8')
+    if hashed_password is None:
+        bcrypt.checkpw(password_bytes, _DUMMY_HASH)
+        return False
     hashed_bytes = hashed_password.encode('utf-8')
     # Verify
     return bcrypt.checkpw(password_bytes, hashed_bytes)
@@ -3,11 +3,21 @@ Database module - Async Postgres with connection pooling
 """
 
 import asyncpg
+import time
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from dataclasses import dataclass
 import json
 
+# How long get_user_by_id may serve a cached user row (seconds). Writes through
+# this process invalidate immediately; the TTL bounds staleness from others
+USER_CACHE_TTL = 2.0
+# Cached user rows kept before expired ones are pruned
+USER_CACHE_MAX_SIZE = 1024
+
+# Advisory lock held by the running backend process; a second one refuses to start
+INSTANCE_LOCK_KEY = 7_041_001
+
 
 @dataclass
 class GameTick:
@@ -70,6 +80,13 @@ class Database:
     def __init__(self, database_url: str):
         self.database_url = database_url
         self.pool: Optional[asyncpg.Pool] = None
+        # user_id -> (fetched at, row)
+        self._user_cache: Dict[int, Tuple[float, Dict]] = {}
+        # Bumped on every invalidation so a read that raced a write doesn't
+        # cache the pre-write row
+        self._user_cache_version = 0
+        # Dedicated connection holding INSTANCE_LOCK_KEY
+        self._instance_conn: Optional[asyncpg.Connection] = None
     
     async def connect(self):
         """Create connection pool"""
@@ -81,8 +98,24 @@ class Database:
     
     async def disconnect(self):
         """Close connection pool"""
+        if self._instance_conn:
+            await self._instance_conn.close()
+            self._instance_conn = None
         if self.pool:
             await self.pool.close()
+
+    async def acquire_instance_lock(self) -> bool:
+        """Try to take the single-instance lock, held until disconnect.
+
+        The lock lives on its own connection rather than a pooled one, so
+        Postgres releases it as soon as this process goes away.
+        """
+        conn = await asyncpg.connect(self.database_url)
+        if await conn.fetchval("SELECT pg_try_advisory_lock($1)", INSTANCE_LOCK_KEY):
+            self._instance_conn = conn
+            return True
+        await conn.close()
+        return False
     
     async def create_tables(self):
         """Create tables if they don't exist"""
@@ -249,20 +282,32 @@ class Database:
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_trades_event ON bot_trades(event_ticker)
             """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_event_entry ON bot_trades(event_ticker, entry_tick)
+            """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sessions_started ON game_sessions(started_at DESC)
+            """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_user_exit ON bot_trades(user_id, exit_time DESC)
+            """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_user_open ON bot_trades(user_id) WHERE exit_time IS NULL
+            """)
 
     # ========================================================================
     # USER METHODS
     # ========================================================================
 
-    async def create_user(self, username: str, password_hash: str, starting_balance: float = 10000.0) -> int:
-        """Create a new user, return user ID"""
+    async def create_user(self, username: str, password_hash: str, starting_balance: float = 10000.0) -> Dict:
+        """Create a new user, return the new user row"""
         async with self.pool.acquire() as conn:
-            user_id = await conn.fetchval("""
+            row = await conn.fetchrow("""
                 INSERT INTO users (username, password_hash, starting_balance, current_balance)
                 VALUES ($1, $2, $3, $3)
-                RETURNING id
+                RETURNING id, username, current_balance, starting_balance, total_pnl
             """, username, password_hash, starting_balance)
-            return user_id
+            return dict(row)
 
     async def get_user_by_username(self, username: str) -> Optional[Dict]:
         """Get user by username"""
@@ -272,23 +317,59 @@ class Database:
             """, username)
             return dict(row) if row else None
 
-    async def get_user_by_id(self, user_id: int) -> Optional[Dict]:
-        """Get user by ID"""
+    async def get_user_by_id(self, user_id: int, fresh: bool = False) -> Optional[Dict]:
+        """Get user by ID (cached for USER_CACHE_TTL seconds unless fresh)"""
+        cached = None if fresh else self._user_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < USER_CACHE_TTL:
+            return dict(cached[1])
+
+        version = self._user_cache_version
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow("""
                 SELECT * FROM users WHERE id = $1
             """, user_id)
-            return dict(row) if row else None
-
-    async def update_user_balance(self, user_id: int, new_balance: float, pnl_change: float = 0) -> None:
-        """Update user's balance and total P&L"""
+        if not row:
+            return None
+
+        user = dict(row)
+        if version == self._user_cache_version:
+            now = time.monotonic()
+            if len(self._user_cache) >= USER_CACHE_MAX_SIZE:
+                self._prune_user_cache(now)
+            self._user_cache[user_id] = (now, user)
+        return dict(user)
+
+    def _prune_user_cache(self, now: float) -> None:
+        """Drop expired cached users, or all of them if none have expired"""
+        live = {
+            user_id: entry for user_id, entry in self._user_cache.items()
+            if now - entry[0] < USER_CACHE_TTL
+        }
+        self._user_cache = live if len(live) < USER_CACHE_MAX_SIZE else {}
+
+    def _invalidate_user(self, user_id: Optional[int] = None) -> None:
+        """Drop one cached user row, or all of them"""
+        self._user_cache_version += 1
+        if user_id is None:
+            self._user_cache.clear()
+        else:
+            self._user_cache.pop(user_id, None)
+
+    async def adjust_user_balance(self, user_id: int, amount: float) -> Optional[float]:
+        """Atomically add amount to a user's balance (negative to withdraw).
+
+        Returns the new balance, or None if the user doesn't exist or a
+        withdrawal exceeds the balance. The change is applied in SQL, so it
+        never overwrites a concurrent one with a stale balance.
+        """
         async with self.pool.acquire() as conn:
-            await conn.execute("""
-                UPDATE users SET
-                    current_balance = $2,
-                    total_pnl = total_pnl + $3
-                WHERE id = $1
-            """, user_id, new_balance, pnl_change)
+            new_balance = await conn.fetchval("""
+                UPDATE users SET current_balance = current_balance + $2::float8
+                WHERE id = $1 AND ($2::float8 >= 0 OR current_balance + $2::float8 >= 0)
+                RETURNING current_balance
+            """, user_id, amount)
+        self._invalidate_user(user_id)
+        return new_balance
 
     async def get_user_default_bot_config(self, user_id: int) -> Dict:
         """Get user's default bot configuration"""
@@ -318,6 +399,7 @@ class Database:
             await conn.execute("""
                 UPDATE users SET default_bot_config = $2::jsonb WHERE id = $1
             """, user_id, json.dumps(config))
+        self._invalidate_user(user_id)
 
     async def add_wallet_transaction(self, user_id: int, amount: float, tx_type: str, balance_after: float, event_ticker: str = None, trade_id: int = None) -> None:
         """Record a wallet transaction"""
@@ -338,12 +420,43 @@ class Database:
             """, user_id, limit)
             return [dict(row) for row in rows]
 
-    async def get_user_trades(self, user_id: int) -> List[Dict]:
-        """Get all trades for a user"""
+    async def get_user_trade_stats(self, user_id: int) -> Dict:
+        """Get aggregated trade statistics for a user in one row"""
+        async with self.pool.acquire() as conn:
+            # A trade is completed if it has an exit_time (more reliable than
+            # exit_price which could be 0)
+            row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) as total_trades,
+                    COUNT(*) FILTER (WHERE exit_time IS NOT NULL) as completed_trades,
+                    COUNT(*) FILTER (WHERE exit_time IS NULL) as open_trades,
+                    COUNT(*) FILTER (WHERE exit_time IS NOT NULL AND pnl > 0) as wins,
+                    COUNT(*) FILTER (WHERE exit_time IS NOT NULL AND COALESCE(pnl, 0) <= 0) as losses,
+                    COALESCE(SUM(pnl) FILTER (WHERE exit_time IS NOT NULL), 0) as total_pnl,
+                    COALESCE(MAX(COALESCE(pnl, 0)) FILTER (WHERE exit_time IS NOT NULL), 0) as biggest_win,
+                    COALESCE(MIN(COALESCE(pnl, 0)) FILTER (WHERE exit_time IS NOT NULL), 0) as biggest_loss
+                FROM bot_trades
+                WHERE user_id = $1
+            """, user_id)
+            return dict(row)
+
+    async def get_recent_completed_trades(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """Get a user's most recently exited trades"""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM bot_trades
+                WHERE user_id = $1 AND exit_time IS NOT NULL
+                ORDER BY exit_time DESC
+                LIMIT $2
+            """, user_id, limit)
+            return [dict(row) for row in rows]
+
+    async def get_open_positions(self, user_id: int) -> List[Dict]:
+        """Get a user's trades that haven't exited yet"""
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("""
                 SELECT * FROM bot_trades
-                WHERE user_id = $1
+                WHERE user_id = $1 AND exit_time IS NULL
                 ORDER BY entry_time DESC
             """, user_id)
             return [dict(row) for row in rows]
@@ -387,6 +500,7 @@ class Database:
                         total_pnl = 0
                     WHERE id = $1
                 """, user_id)
+        self._invalidate_user(user_id)
 
     async def cleanup_wallet_double_counting(self) -> Dict:
         """
@@ -445,11 +559,12 @@ class Database:
                     RETURNING COUNT(*)
                 """)
 
-                return {
-                    'users_affected': len(corrections),
-                    'transactions_removed': deleted_count,
-                    'corrections': corrections
-                }
+        self._invalidate_user()
+        return {
+            'users_affected': len(corrections),
+            'transactions_removed': deleted_count,
+            'corrections': corrections
+        }
 
     async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
         """Get leaderboard of top users by total P&L"""
@@ -638,52 +753,88 @@ class Database:
                 tick.get('goal_to_go'), tick.get('status'), tick.get('last_play')
             )
     
-    async def get_ticks(self, event_ticker: str, limit: int = 100, offset: int = 0) -> List[Dict]:
-        """Get ticks for a game with pagination"""
+    async def get_ticks_with_total(self, event_ticker: str, limit: int = 100, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Get a page of ticks plus the game's total tick count in one round trip"""
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT * FROM game_ticks 
-                WHERE event_ticker = $1 
+                SELECT *, COUNT(*) OVER () AS total_count FROM game_ticks
+                WHERE event_ticker = $1
                 ORDER BY tick DESC
                 LIMIT $2 OFFSET $3
             """, event_ticker, limit, offset)
-            return [dict(row) for row in rows]
+
+            if not rows:
+                # Past the last page - no row to carry the window count
+                total = await conn.fetchval("""
+                    SELECT COUNT(*) FROM game_ticks WHERE event_ticker = $1
+                """, event_ticker)
+                return [], total or 0
+
+            total = rows[0]['total_count']
+            ticks = []
+            for row in rows:
+                tick_dict = dict(row)
+                del tick_dict['total_count']
+                ticks.append(tick_dict)
+            return ticks, total
     
-    async def get_recent_ticks(self, event_ticker: str, limit: int = 5) -> List[Dict]:
-        """Get most recent ticks"""
+    async def get_recent_ticks_many(self, event_tickers: List[str], limit: int = 5) -> Dict[str, List[Dict]]:
+        """Get most recent ticks for several games in one query, keyed by event ticker"""
+        result: Dict[str, List[Dict]] = {ticker: [] for ticker in event_tickers}
+        if not event_tickers:
+            return result
+
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT * FROM game_ticks
-                WHERE event_ticker = $1
-                ORDER BY tick DESC
-                LIMIT $2
-            """, event_ticker, limit)
-            result = []
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY event_ticker ORDER BY tick DESC
+                    ) AS rn
+                    FROM game_ticks
+                    WHERE event_ticker = ANY($1::text[])
+                ) t
+                WHERE rn <= $2
+                ORDER BY event_ticker, tick DESC
+            """, event_tickers, limit)
             for row in rows:
                 tick_dict = dict(row)
+                del tick_dict['rn']
                 # Convert datetime to ISO string for JSON serialization
-                if 'timestamp' in tick_dict and tick_dict['timestamp']:
+                if tick_dict.get('timestamp'):
                     tick_dict['timestamp'] = tick_dict['timestamp'].isoformat()
-                result.append(tick_dict)
+                result[tick_dict['event_ticker']].append(tick_dict)
             return result
     
-    async def get_all_ticks(self, event_ticker: str) -> List[Dict]:
-        """Get all ticks for export"""
+    async def get_ticks_after(self, event_ticker: str, after_tick: int = -1, limit: int = 1000) -> List[Dict]:
+        """Get the next page of ticks after a given tick (keyset pagination)"""
         async with self.pool.acquire() as conn:
+            # Seeks straight to the page on (event_ticker, tick), unlike OFFSET
             rows = await conn.fetch("""
-                SELECT * FROM game_ticks 
-                WHERE event_ticker = $1 
+                SELECT * FROM game_ticks
+                WHERE event_ticker = $1 AND tick > $2
                 ORDER BY tick ASC
-            """, event_ticker)
+                LIMIT $3
+            """, event_ticker, after_tick, limit)
             return [dict(row) for row in rows]
     
-    async def get_tick_count(self, event_ticker: str) -> int:
-        """Get total tick count for a game"""
+    async def iter_ticks(self, event_ticker: str, batch_size: int = 1000) -> AsyncIterator[List[asyncpg.Record]]:
+        """Stream all ticks for a game in batches using a server-side cursor.
+
+        Rows are yielded as asyncpg Records (tuple-like, in column order) so
+        bulk consumers like the CSV export can skip per-row dict conversion.
+        """
         async with self.pool.acquire() as conn:
-            result = await conn.fetchval("""
-                SELECT COUNT(*) FROM game_ticks WHERE event_ticker = $1
-            """, event_ticker)
-            return result or 0
+            async with conn.transaction():
+                cursor = await conn.cursor("""
+                    SELECT * FROM game_ticks
+                    WHERE event_ticker = $1
+                    ORDER BY tick ASC
+                """, event_ticker)
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        break
+                    yield rows
     
     async def get_last_tick(self, event_ticker: str) -> Optional[Dict]:
         """Get most recent tick"""
@@ -750,6 +901,30 @@ class Database:
                 ORDER BY entry_tick ASC
             """, event_ticker)
             return [dict(row) for row in rows]
+
+    async def get_user_game_trades(self, event_ticker: str, user_id: int) -> List[Dict]:
+        """Get one user's trades for a game"""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM bot_trades
+                WHERE event_ticker = $1 AND user_id = $2
+                ORDER BY entry_tick ASC
+            """, event_ticker, user_id)
+            return [dict(row) for row in rows]
+
+    async def get_bot_trade_summary(self, event_ticker: str) -> Dict:
+        """Get trade count, wins, losses and total P&L for a game"""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) as total_trades,
+                    COUNT(*) FILTER (WHERE pnl > 0) as wins,
+                    COUNT(*) FILTER (WHERE pnl <= 0 AND exit_price IS NOT NULL) as losses,
+                    COALESCE(SUM(pnl), 0) as total_pnl
+                FROM bot_trades
+                WHERE event_ticker = $1
+            """, event_ticker)
+            return dict(row)
     
     async def get_open_trade(self, event_ticker: str) -> Optional[Dict]:
         """Get open trade (no exit) for a game"""
@@ -4,8 +4,33 @@ Trades based on real-time tick data with wallet and P&L tracking
 """
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Dict, List, Any, Callable
 import json
+import re
+
+# Clock forms other than plain "MM:SS", e.g. basketball's "0:45.3"
+_CLOCK_RE = re.compile(r'^\s*(\d+):(\d+)(?:\.\d+)?\s*$')
+
+
+@lru_cache(maxsize=4096)
+def _clock_to_seconds(clock: str) -> int:
+    """Parse a game clock ("12:34", "0:45.3" or plain seconds) into seconds, 900 if unparseable"""
+    mins, sep, secs = clock.partition(':')
+    if sep:
+        # Fast path for the common "MM:SS" case
+        if mins.isdecimal() and secs.isdecimal():
+            return int(mins) * 60 + int(secs)
+        match = _CLOCK_RE.match(clock)
+        if match:
+            return int(match.group(1)) * 60 + int(match.group(2))
+        return 900
+
+    # If no colon, assume it's already in seconds
+    try:
+        return int(float(clock))
+    except (ValueError, OverflowError):
+        return 900
 
 
 class LivePaperBot:
@@ -77,6 +102,10 @@ class LivePaperBot:
         self.favorite_fade_threshold = favorite_fade_threshold
         self.underdog_support_threshold = underdog_support_threshold
 
+        # Volatility factor indexed by min(|score_diff|, 15):
+        # 0-6 close game, 7-14 moderate lead, 15+ blowout
+        self._vol_lut = (1.0,) * 7 + (score_volatility_multiplier,) * 8 + (0.9,)
+
         # Opening price tracking
         self.opening_home_price: Optional[int] = None
         self.opening_away_price: Optional[int] = None
@@ -509,17 +538,13 @@ class LivePaperBot:
         if not self.user_id:
             raise ValueError("Cannot top up bot without user_id")
 
-        # Check user has enough balance
-        user = await self.db.get_user_by_id(self.user_id)
-        if not user:
-            raise ValueError("User not found")
-
-        if user['current_balance'] < amount:
+        # Deduct from user wallet (fails without touching it if funds are short)
+        new_balance = await self.db.adjust_user_balance(self.user_id, -amount)
+        if new_balance is None:
+            user = await self.db.get_user_by_id(self.user_id, fresh=True)
+            if not user:
+                raise ValueError("User not found")
             raise ValueError(f"Insufficient funds. Available: ${user['current_balance']:.2f}, Requested: ${amount:.2f}")
-
-        # Deduct from user wallet
-        new_balance = user['current_balance'] - amount
-        await self.db.update_user_balance(self.user_id, new_balance)
         await self.db.add_wallet_transaction(
             user_id=self.user_id,
             amount=-amount,
@@ -566,10 +591,8 @@ class LivePaperBot:
 
         # Return remaining bankroll to user wallet
         if self.user_id and self.bankroll > 0:
-            user = await self.db.get_user_by_id(self.user_id)
-            if user:
-                new_balance = user['current_balance'] + self.bankroll
-                await self.db.update_user_balance(self.user_id, new_balance)
+            new_balance = await self.db.adjust_user_balance(self.user_id, self.bankroll)
+            if new_balance is not None:
                 await self.db.add_wallet_transaction(
                     user_id=self.user_id,
                     amount=self.bankroll,
@@ -605,20 +628,8 @@ class LivePaperBot:
         if quarter >= 5:  # Final
             return 0
 
-        # Parse clock string
-        clock_seconds = 0
-        try:
-            if ':' in str(clock):
-                parts = str(clock).strip().split(':')
-                mins = int(parts[0])
-                secs = int(parts[1]) if len(parts) > 1 else 0
-                clock_seconds = mins * 60 + secs
-            else:
-                # If no colon, assume it's already in seconds
-                clock_seconds = int(float(str(clock)))
-        except:
-            # Default to full quarter if parse fails
-            clock_seconds = 900
+        # Parse clock string (defaults to a full quarter if unparseable)
+        clock_seconds = _clock_to_seconds(str(clock))
 
         # Calculate remaining time
         # Quarters after current quarter
@@ -777,7 +788,7 @@ class LivePaperBot:
         )
 
         # Calculate which quartile we're in
-        time_quartile = min(3, int((3600 - time_remaining) / 900))
+        time_quartile = min(3, (3600 - time_remaining) // 900)
 
         # Possession factor (favor team with ball)
         possession_factor = 1.0
@@ -795,14 +806,9 @@ class LivePaperBot:
                     possession_factor = 1.0 + (self.possession_bias_cents / 100.0)
 
         # Volatility factor based on score differential
-        volatility_factor = 1.0
-        score_diff = abs(tick.get('score_diff', 0))
-        if score_diff > 14:
-            # Blowout: lower volatility (garbage time)
-            volatility_factor = 0.9
-        elif 7 <= score_diff <= 14:
-            # Moderate lead: higher volatility (losing team pressing)
-            volatility_factor = self.score_volatility_multiplier
+        # Blowouts are lower volatility (garbage time), moderate leads higher
+        # (losing team pressing)
+        volatility_factor = self._vol_lut[min(abs(tick.get('score_diff', 0)), 15)]
 
         # Market sentiment
         current_price = tick.get('home_price', 50)
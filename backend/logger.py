@@ -4,11 +4,29 @@ Game Logger - Fetches data from Kalshi API and stores in database
 
 import asyncio
 import httpx
+import orjson
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Dict, List
 
 KALSHI_API_BASE = "https://api.elections.kalshi.com/trade-api/v2"
 
+# Unchanged ticks are not stored, but every Nth tick still advances the
+# session's last_tick so a resumed logger continues from the right count
+HEARTBEAT_TICKS = 30
+
+# Stored ticks kept in memory for the WebSocket init message
+RECENT_TICKS = 5
+# Fields of a recent tick as sent in the init message - the stored game_ticks
+# columns, whether the tick came from this logger or from the database
+RECENT_TICK_FIELDS = (
+    'event_ticker', 'tick', 'timestamp', 'home_team', 'away_team',
+    'home_price', 'away_price', 'home_bid', 'home_ask', 'away_bid', 'away_ask',
+    'home_volume', 'away_volume', 'quarter', 'clock', 'home_score', 'away_score',
+    'score_diff', 'possession_team_id', 'down', 'yards_to_go', 'yardline',
+    'goal_to_go', 'status', 'last_play'
+)
+
 
 class GameLogger:
     def __init__(
@@ -18,7 +36,10 @@ class GameLogger:
         db: Any,
         broadcast_fn: Optional[Callable] = None,
         start_tick: int = 0,
-        interval: int = 1
+        interval: int = 1,
+        home_team: str = "",
+        away_team: str = "",
+        http_client: Optional[httpx.AsyncClient] = None
     ):
         self.event_ticker = event_ticker
         self.milestone_id = milestone_id
@@ -26,6 +47,10 @@ class GameLogger:
         self.broadcast_fn = broadcast_fn
         self.interval = interval
 
+        # Pooled HTTP client shared with the app; a private one is opened in
+        # start() if none is given
+        self.http = http_client
+
         self.tick_count = start_tick
         self.is_running = False
         self.status = "initialized"
@@ -33,9 +58,9 @@ class GameLogger:
         # Detect sport type
         self.sport_type = self._detect_sport_type()
 
-        # Team info
-        self.home_team = ""
-        self.away_team = ""
+        # Team info (passed in when resuming a session that already has it)
+        self.home_team = home_team or ""
+        self.away_team = away_team or ""
         self.home_team_id = ""
         self.away_team_id = ""
 
@@ -49,9 +74,49 @@ class GameLogger:
         self.last_play = ""
         self.last_status = ""
 
+        # Most recent stored ticks (newest first) and their encoded form, so
+        # WebSocket connects don't query or re-serialize them. Ticks stored
+        # before this logger started are merged in once by seed_recent_ticks
+        self.recent_ticks: deque = deque(maxlen=RECENT_TICKS)
+        self.recent_ticks_json = orjson.Fragment(b"[]")
+        self.needs_seed = True
+
+        # Last event payload and its ETag, for conditional re-fetches
+        self._event_etag: Optional[str] = None
+        self._event_data: dict = {}
+
         # Attached bot
         self.bot = None
 
+    def seed_recent_ticks(self, ticks: List[Dict]):
+        """Merge ticks stored before this logger started (newest first)"""
+        if not self.needs_seed:
+            return
+        self.needs_seed = False
+        # Ticks stored since starting are newer; only older ones fill the rest
+        # (appending past maxlen would push the newest out of the front)
+        oldest = self.recent_ticks[-1]['tick'] if self.recent_ticks else None
+        older = [tick for tick in ticks if oldest is None or tick['tick'] < oldest]
+        free = RECENT_TICKS - len(self.recent_ticks)
+        self.recent_ticks.extend(self._recent_tick(tick) for tick in older[:free])
+        self._encode_recent_ticks()
+
+    def _remember_tick(self, tick: dict):
+        """Record a stored tick and re-encode the recent ticks once"""
+        self.recent_ticks.appendleft(self._recent_tick(tick))
+        self._encode_recent_ticks()
+
+    @staticmethod
+    def _recent_tick(tick: Dict) -> Dict:
+        """Project a live or stored tick onto the init message's tick shape"""
+        recent = {field: tick.get(field) for field in RECENT_TICK_FIELDS}
+        recent['tick_count'] = tick['tick']
+        return recent
+
+    def _encode_recent_ticks(self):
+        """Encode the recent ticks once for every init message that follows"""
+        self.recent_ticks_json = orjson.Fragment(orjson.dumps(list(self.recent_ticks)))
+
     def _detect_sport_type(self) -> str:
         """Detect sport type from event ticker"""
         ticker = self.event_ticker.upper()
@@ -74,20 +139,29 @@ class GameLogger:
         """Start the logging loop"""
         self.is_running = True
         self.status = "running"
-        
-        # Fetch initial team info
-        await self._fetch_team_info()
-        
-        while self.is_running:
-            try:
-                await self._tick()
-                await asyncio.sleep(self.interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Logger error for {self.event_ticker}: {e}")
-                await asyncio.sleep(self.interval)
-        
+
+        owns_client = self.http is None
+        if owns_client:
+            self.http = httpx.AsyncClient()
+
+        try:
+            # Fetch initial team info
+            await self._fetch_team_info()
+
+            while self.is_running:
+                try:
+                    await self._tick()
+                    await asyncio.sleep(self.interval)
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    print(f"Logger error for {self.event_ticker}: {e}")
+                    await asyncio.sleep(self.interval)
+        finally:
+            if owns_client:
+                await self.http.aclose()
+                self.http = None
+
         self.status = "stopped"
     
     async def stop(self):
@@ -96,42 +170,47 @@ class GameLogger:
     
     async def _fetch_team_info(self):
         """Fetch team names and IDs from event endpoint"""
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(
-                    f"{KALSHI_API_BASE}/events/{self.event_ticker}",
-                    timeout=10
-                )
+        # Resumed sessions already have their team names stored
+        if self.home_team and self.away_team:
+            return
+
+        try:
+            resp = await self.http.get(
+                f"{KALSHI_API_BASE}/events/{self.event_ticker}",
+                timeout=10
+            )
+            
+            if resp.status_code == 200:
+                data = resp.json()
+                self._event_data = data
+                self._event_etag = resp.headers.get('etag')
+                markets = data.get('markets', [])
                 
-                if resp.status_code == 200:
-                    data = resp.json()
-                    markets = data.get('markets', [])
+                if len(markets) >= 2:
+                    self.home_team = markets[0].get('yes_sub_title', 'Home')
+                    self.home_team_id = markets[0].get('custom_strike', {}).get('football_team', '')
+                    self.away_team = markets[1].get('yes_sub_title', 'Away')
+                    self.away_team_id = markets[1].get('custom_strike', {}).get('football_team', '')
                     
-                    if len(markets) >= 2:
-                        self.home_team = markets[0].get('yes_sub_title', 'Home')
-                        self.home_team_id = markets[0].get('custom_strike', {}).get('football_team', '')
-                        self.away_team = markets[1].get('yes_sub_title', 'Away')
-                        self.away_team_id = markets[1].get('custom_strike', {}).get('football_team', '')
-                        
-                        # Update session with team names
-                        await self.db.update_session_teams(
-                            self.event_ticker,
-                            self.home_team,
-                            self.away_team
-                        )
-
-                        # Broadcast team info to frontend immediately
-                        if self.broadcast_fn:
-                            await self.broadcast_fn({
-                                "type": "team_info",
-                                "event_ticker": self.event_ticker,
-                                "data": {
-                                    "home_team": self.home_team,
-                                    "away_team": self.away_team
-                                }
-                            })
-            except Exception as e:
-                print(f"Error fetching team info: {e}")
+                    # Update session with team names
+                    await self.db.update_session_teams(
+                        self.event_ticker,
+                        self.home_team,
+                        self.away_team
+                    )
+
+                    # Broadcast team info to frontend immediately
+                    if self.broadcast_fn:
+                        await self.broadcast_fn({
+                            "type": "team_info",
+                            "event_ticker": self.event_ticker,
+                            "data": {
+                                "home_team": self.home_team,
+                                "away_team": self.away_team
+                            }
+                        })
+        except Exception as e:
+            print(f"Error fetching team info: {e}")
     
     async def _tick(self):
         """Perform one tick - fetch data and store"""
@@ -154,6 +233,9 @@ class GameLogger:
         if has_changed:
             await self.db.insert_tick(tick)
             await self.db.update_session_tick(self.event_ticker, self.tick_count)
+            self._remember_tick(tick)
+        elif self.tick_count % HEARTBEAT_TICKS == 0:
+            await self.db.update_session_tick(self.event_ticker, self.tick_count)
 
         # Update last known state (always update to track changes)
         self._update_state(tick)
@@ -164,17 +246,14 @@ class GameLogger:
 
         # Broadcast to WebSocket clients (only if changed to reduce traffic)
         if has_changed and self.broadcast_fn:
-            # Convert datetime to string for JSON serialization
-            tick_data = tick.copy()
-            if 'timestamp' in tick_data and tick_data['timestamp']:
-                tick_data['timestamp'] = tick_data['timestamp'].isoformat()
-            # Add tick_count for frontend compatibility
-            tick_data['tick_count'] = self.tick_count
+            # Add tick_count for frontend compatibility (the broadcaster
+            # serializes the timestamp, so the tick is sent without a copy)
+            tick['tick_count'] = self.tick_count
 
             await self.broadcast_fn({
                 "type": "tick",
                 "event_ticker": self.event_ticker,
-                "data": tick_data
+                "data": tick
             })
 
         # Check if game ended
@@ -188,107 +267,99 @@ class GameLogger:
                 await self.bot.stop('GAME_ENDED')
     
     async def _fetch_market_data(self) -> dict:
-        """Fetch current market prices"""
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(
-                    f"{KALSHI_API_BASE}/events/{self.event_ticker}",
-                    timeout=10
-                )
-                
-                if resp.status_code == 200:
-                    return resp.json()
-            except Exception as e:
-                print(f"Error fetching market data: {e}")
+        """Fetch current market prices, reusing the last payload if unchanged"""
+        try:
+            headers = {'If-None-Match': self._event_etag} if self._event_etag else None
+            resp = await self.http.get(
+                f"{KALSHI_API_BASE}/events/{self.event_ticker}",
+                headers=headers,
+                timeout=10
+            )
+
+            if resp.status_code == 304:
+                return self._event_data
+            if resp.status_code == 200:
+                self._event_data = resp.json()
+                self._event_etag = resp.headers.get('etag')
+                return self._event_data
+        except Exception as e:
+            print(f"Error fetching market data: {e}")
         
         return {}
     
     async def _fetch_live_data(self) -> dict:
         """Fetch live game state"""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Use appropriate endpoint based on sport type
-                sport_endpoint = f"{self.sport_type}_game"
-                resp = await client.get(
-                    f"{KALSHI_API_BASE}/live_data/{sport_endpoint}/milestone/{self.milestone_id}",
-                    timeout=10
-                )
-
-                if resp.status_code == 200:
-                    return resp.json().get('live_data', {}).get('details', {})
-            except Exception as e:
-                print(f"Error fetching live data: {e}")
+        try:
+            # Use appropriate endpoint based on sport type
+            sport_endpoint = f"{self.sport_type}_game"
+            resp = await self.http.get(
+                f"{KALSHI_API_BASE}/live_data/{sport_endpoint}/milestone/{self.milestone_id}",
+                timeout=10
+            )
+
+            if resp.status_code == 200:
+                return resp.json().get('live_data', {}).get('details', {})
+        except Exception as e:
+            print(f"Error fetching live data: {e}")
 
         return {}
     
     def _build_tick(self, timestamp: datetime, market_data: dict, live_data: dict) -> dict:
         """Build a tick record from API data"""
         markets = market_data.get('markets', [])
-        home = markets[0] if len(markets) > 0 else {}
-        away = markets[1] if len(markets) > 1 else {}
+        hg = markets[0].get if len(markets) > 0 else {}.get
+        ag = markets[1].get if len(markets) > 1 else {}.get
 
-        situation = live_data.get('situation', {})
-        last_play_obj = live_data.get('last_play', {})
+        # Bind lookups once - this runs every tick for every game
+        lg = live_data.get
+        sg = lg('situation', {}).get
+        last_play_obj = lg('last_play', {})
 
-        home_score = live_data.get('home_points', 0)
-        away_score = live_data.get('away_points', 0)
+        home_score = lg('home_points', 0)
+        away_score = lg('away_points', 0)
 
         # Map sport-specific fields to common format
-        if self.sport_type == 'basketball':
-            # Basketball uses different field names
-            quarter = live_data.get('period', 0)
-            clock = live_data.get('period_remaining_time', '')
-            possession = live_data.get('possession', '')  # "home" or "away" string
-        else:
+        is_football = self.sport_type != 'basketball'
+        if is_football:
             # Football uses standard field names
-            quarter = live_data.get('quarter', 0)
-            clock = live_data.get('clock', '')
-            possession = situation.get('possession_team_id', '')
+            quarter = lg('quarter', 0)
+            clock = lg('clock', '')
+            possession = sg('possession_team_id', '')
+        else:
+            # Basketball uses different field names
+            quarter = lg('period', 0)
+            clock = lg('period_remaining_time', '')
+            possession = lg('possession', '')  # "home" or "away" string
 
-        # Build base tick (works for all sports)
-        tick_data = {
+        return {
             'event_ticker': self.event_ticker,
             'tick': self.tick_count,
             'timestamp': timestamp,
             'home_team': self.home_team,
             'away_team': self.away_team,
-            'home_price': home.get('last_price', 0),
-            'away_price': away.get('last_price', 0),
-            'home_bid': home.get('yes_bid', 0),
-            'home_ask': home.get('yes_ask', 0),
-            'away_bid': away.get('yes_bid', 0),
-            'away_ask': away.get('yes_ask', 0),
-            'home_volume': home.get('volume', 0),
-            'away_volume': away.get('volume', 0),
+            'home_price': hg('last_price', 0),
+            'away_price': ag('last_price', 0),
+            'home_bid': hg('yes_bid', 0),
+            'home_ask': hg('yes_ask', 0),
+            'away_bid': ag('yes_bid', 0),
+            'away_ask': ag('yes_ask', 0),
+            'home_volume': hg('volume', 0),
+            'away_volume': ag('volume', 0),
             'quarter': quarter,
             'clock': clock,
             'home_score': home_score,
             'away_score': away_score,
             'score_diff': home_score - away_score,
-            'status': live_data.get('status', 'unknown'),
-            'last_play': (last_play_obj.get('description', '') if last_play_obj else '')[:200]
+            'status': lg('status', 'unknown'),
+            'last_play': (last_play_obj.get('description', '') if last_play_obj else '')[:200],
+            # "home"/"away" string for basketball
+            'possession_team_id': possession,
+            # Basketball has no down/distance
+            'down': sg('down', 0) if is_football else 0,
+            'yards_to_go': sg('yfd', 0) if is_football else 0,
+            'yardline': sg('yardline', 0) if is_football else 0,
+            'goal_to_go': sg('goal_to_go', False) if is_football else False
         }
-
-        # Add sport-specific fields
-        if self.sport_type == 'football':
-            tick_data.update({
-                'possession_team_id': possession,
-                'down': situation.get('down', 0),
-                'yards_to_go': situation.get('yfd', 0),
-                'yardline': situation.get('yardline', 0),
-                'goal_to_go': situation.get('goal_to_go', False)
-            })
-        else:
-            # Basketball - simpler possession, no down/distance
-            tick_data.update({
-                'possession_team_id': possession,  # "home" or "away" for basketball
-                'down': 0,
-                'yards_to_go': 0,
-                'yardline': 0,
-                'goal_to_go': False
-            })
-
-        return tick_data
     
     def _has_tick_changed(self, tick: dict) -> bool:
         """Check if tick has meaningful changes compared to last state"""
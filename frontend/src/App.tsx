@@ -56,7 +56,7 @@ function App() {
     ? `wss://${window.location.host}/ws`
     : `ws://${window.location.hostname}:8000/ws`;
   
-  const { isConnected, lastMessage } = useWebSocket(wsUrl);
+  const { isConnected, messages } = useWebSocket(wsUrl);
 
   // Load games on mount
   useEffect(() => {
@@ -65,102 +65,102 @@ function App() {
 
   // Handle WebSocket messages
   useEffect(() => {
-    if (!lastMessage) return;
-
-    if (lastMessage.type === 'tick') {
-      setActiveGames(prev => prev.map(game =>
-        game.event_ticker === lastMessage.event_ticker
-          ? { ...game, ...lastMessage.data }
-          : game
-      ));
-    } else if (lastMessage.type === 'team_info') {
-      setActiveGames(prev => prev.map(game =>
-        game.event_ticker === lastMessage.event_ticker
-          ? { ...game, ...lastMessage.data }
-          : game
-      ));
-    } else if (lastMessage.type === 'live_bot_started') {
-      const ticker = lastMessage.event_ticker;
-      if (ticker) {
-        setLiveBotRunning(prev => ({ ...prev, [ticker]: true }));
-        loadLiveBotTrades(ticker);
-      }
-    } else if (lastMessage.type === 'live_bot_stopped') {
-      const ticker = lastMessage.event_ticker;
-      if (ticker) {
-        setLiveBotRunning(prev => ({ ...prev, [ticker]: false }));
-      }
-      // Refresh wallet balance when bot stops (remaining bankroll returned)
-      refreshUser();
-    } else if (lastMessage.type === 'live_bot_wallet') {
-      const ticker = lastMessage.event_ticker;
-      if (ticker && lastMessage.data) {
-        setLiveBotWallets(prev => ({ ...prev, [ticker]: lastMessage.data }));
-      }
-    } else if (lastMessage.type === 'live_bot_entry' || lastMessage.type === 'live_bot_exit') {
-      const ticker = lastMessage.event_ticker;
-      console.log('[WebSocket] Live bot trade event:', lastMessage.type, ticker);
-
-      // Get game title for toast
-      const game = activeGames.find(g => g.event_ticker === ticker) || availableGames.find(g => g.event_ticker === ticker);
-      const gameTitle = game?.title || (game?.home_team && game?.away_team ? `${game.away_team} @ ${game.home_team}` : ticker);
-
-      if (lastMessage.type === 'live_bot_entry' && lastMessage.data) {
-        // Trade entry toast
-        const { side, price, contracts } = lastMessage.data;
-        toast.success(
-          `${gameTitle}\n${side.toUpperCase()} entry at ${price}¢ (${contracts} contracts)`,
-          {
-            duration: 4000,
-            icon: side === 'long' ? '📈' : '📉',
-          }
-        );
-      } else if (lastMessage.type === 'live_bot_exit' && lastMessage.data) {
-        // Trade exit toast
-        const { side, exit_price, pnl, reason } = lastMessage.data;
-        const pnlFormatted = pnl >= 0 ? `+$${pnl.toFixed(2)}` : `-$${Math.abs(pnl).toFixed(2)}`;
-        toast(
-          `${gameTitle}\n${side.toUpperCase()} exit at ${exit_price}¢ • ${pnlFormatted} (${reason})`,
-          {
-            duration: 5000,
-            icon: pnl >= 0 ? '✅' : '❌',
-            style: {
-              background: pnl >= 0 ? '#065f46' : '#991b1b',
-              color: '#fff',
-            },
-          }
-        );
-      }
-
-      if (ticker) {
-        loadLiveBotTrades(ticker);
-      }
-      // Refresh wallet balance when trade exits (funds + P&L returned)
-      if (lastMessage.type === 'live_bot_exit') {
+    for (const message of messages) {
+      if (message.type === 'tick') {
+        setActiveGames(prev => prev.map(game =>
+          game.event_ticker === message.event_ticker
+            ? { ...game, ...message.data }
+            : game
+        ));
+      } else if (message.type === 'team_info') {
+        setActiveGames(prev => prev.map(game =>
+          game.event_ticker === message.event_ticker
+            ? { ...game, ...message.data }
+            : game
+        ));
+      } else if (message.type === 'live_bot_started') {
+        const ticker = message.event_ticker;
+        if (ticker) {
+          setLiveBotRunning(prev => ({ ...prev, [ticker]: true }));
+          loadLiveBotTrades(ticker);
+        }
+      } else if (message.type === 'live_bot_stopped') {
+        const ticker = message.event_ticker;
+        if (ticker) {
+          setLiveBotRunning(prev => ({ ...prev, [ticker]: false }));
+        }
+        // Refresh wallet balance when bot stops (remaining bankroll returned)
         refreshUser();
-      }
-    } else if (lastMessage.type === 'live_bot_topup') {
-      refreshUser();
-    } else if (lastMessage.type === 'init') {
-      if (lastMessage.data?.active_games) {
-        setActiveGames(lastMessage.data.active_games);
-      }
-      if (lastMessage.data?.active_live_bots) {
-        const runningLiveBots: Record<string, boolean> = {};
-        lastMessage.data.active_live_bots.forEach((ticker: string) => {
-          runningLiveBots[ticker] = true;
-        });
-        setLiveBotRunning(runningLiveBots);
-        // Load trades for active live bots
-        lastMessage.data.active_live_bots.forEach((ticker: string) => {
+      } else if (message.type === 'live_bot_wallet') {
+        const ticker = message.event_ticker;
+        if (ticker && message.data) {
+          setLiveBotWallets(prev => ({ ...prev, [ticker]: message.data }));
+        }
+      } else if (message.type === 'live_bot_entry' || message.type === 'live_bot_exit') {
+        const ticker = message.event_ticker;
+        console.log('[WebSocket] Live bot trade event:', message.type, ticker);
+
+        // Get game title for toast
+        const game = activeGames.find(g => g.event_ticker === ticker) || availableGames.find(g => g.event_ticker === ticker);
+        const gameTitle = game?.title || (game?.home_team && game?.away_team ? `${game.away_team} @ ${game.home_team}` : ticker);
+
+        if (message.type === 'live_bot_entry' && message.data) {
+          // Trade entry toast
+          const { side, price, contracts } = message.data;
+          toast.success(
+            `${gameTitle}\n${side.toUpperCase()} entry at ${price}¢ (${contracts} contracts)`,
+            {
+              duration: 4000,
+              icon: side === 'long' ? '📈' : '📉',
+            }
+          );
+        } else if (message.type === 'live_bot_exit' && message.data) {
+          // Trade exit toast
+          const { side, exit_price, pnl, reason } = message.data;
+          const pnlFormatted = pnl >= 0 ? `+$${pnl.toFixed(2)}` : `-$${Math.abs(pnl).toFixed(2)}`;
+          toast(
+            `${gameTitle}\n${side.toUpperCase()} exit at ${exit_price}¢ • ${pnlFormatted} (${reason})`,
+            {
+              duration: 5000,
+              icon: pnl >= 0 ? '✅' : '❌',
+              style: {
+                background: pnl >= 0 ? '#065f46' : '#991b1b',
+                color: '#fff',
+              },
+            }
+          );
+        }
+
+        if (ticker) {
           loadLiveBotTrades(ticker);
-        });
-      }
-      if (lastMessage.data?.live_bot_wallets) {
-        setLiveBotWallets(lastMessage.data.live_bot_wallets);
+        }
+        // Refresh wallet balance when trade exits (funds + P&L returned)
+        if (message.type === 'live_bot_exit') {
+          refreshUser();
+        }
+      } else if (message.type === 'live_bot_topup') {
+        refreshUser();
+      } else if (message.type === 'init') {
+        if (message.data?.active_games) {
+          setActiveGames(message.data.active_games);
+        }
+        if (message.data?.active_live_bots) {
+          const runningLiveBots: Record<string, boolean> = {};
+          message.data.active_live_bots.forEach((ticker: string) => {
+            runningLiveBots[ticker] = true;
+          });
+          setLiveBotRunning(runningLiveBots);
+          // Load trades for active live bots
+          message.data.active_live_bots.forEach((ticker: string) => {
+            loadLiveBotTrades(ticker);
+          });
+        }
+        if (message.data?.live_bot_wallets) {
+          setLiveBotWallets(message.data.live_bot_wallets);
+        }
       }
     }
-  }, [lastMessage]);
+  }, [messages]);
 
   const loadGames = async () => {
     setLoading(true);
@@ -6,15 +6,20 @@ interface WebSocketMessage {
   event_ticker?: string;
 }
 
+const decoder = new TextDecoder();
+
 export function useWebSocket(url: string) {
   const [isConnected, setIsConnected] = useState(false);
-  const [lastMessage, setLastMessage] = useState<WebSocketMessage | null>(null);
+  // Events from the most recent frame - the server merges bursts into one batch
+  const [messages, setMessages] = useState<WebSocketMessage[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<number | null>(null);
 
   const connect = useCallback(() => {
     try {
       const ws = new WebSocket(url);
+      // Server sends pre-encoded JSON as binary frames
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -26,8 +31,9 @@ export function useWebSocket(url: string) {
 
       ws.onmessage = (event) => {
         try {
-          const message = JSON.parse(event.data);
-          setLastMessage(message);
+          const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+          const message = JSON.parse(text);
+          setMessages(message.type === 'batch' ? message.events : [message]);
         } catch (e) {
           console.error('Failed to parse message:', e);
         }
@@ -76,5 +82,5 @@ export function useWebSocket(url: string) {
     }
   }, []);
 
-  return { isConnected, lastMessage, sendMessage };
+  return { isConnected, messages, sendMessage };
 }
@@ -84,14 +84,27 @@ export async function getBotSessionHistory() {
 }
 
 export async function getBotSessionDetail(eventTicker: string) {
-  const res = await fetch(`${API_BASE}/history/${eventTicker}`, {
-    credentials: 'include'
-  });
-  if (!res.ok) {
-    const error = await res.json();
-    throw new Error(error.detail || 'Failed to get session detail');
+  // Ticks come back a page at a time; follow next_after_tick until the
+  // whole game has been loaded
+  let detail: any = null;
+  let afterTick: number | null = -1;
+  while (afterTick !== null) {
+    const res = await fetch(`${API_BASE}/history/${eventTicker}?after_tick=${afterTick}`, {
+      credentials: 'include'
+    });
+    if (!res.ok) {
+      const error = await res.json();
+      throw new Error(error.detail || 'Failed to get session detail');
+    }
+    const page = await res.json();
+    if (detail) {
+      detail.ticks.push(...page.ticks);
+    } else {
+      detail = page;
+    }
+    afterTick = page.next_after_tick;
   }
-  return res.json();
+  return detail;
 }
 
 export function getExportUrl(eventTicker: string) {
@@ -194,17 +207,11 @@ export async function updateLiveBotConfig(eventTicker: string, config: {
   breakeven_trigger?: number;
   position_size_pct?: number;
 }) {
-  const params = new URLSearchParams();
-  if (config.bankroll !== undefined) params.set('bankroll', config.bankroll.toString());
-  if (config.momentum_threshold !== undefined) params.set('momentum_threshold', config.momentum_threshold.toString());
-  if (config.initial_stop !== undefined) params.set('initial_stop', config.initial_stop.toString());
-  if (config.profit_target !== undefined) params.set('profit_target', config.profit_target.toString());
-  if (config.breakeven_trigger !== undefined) params.set('breakeven_trigger', config.breakeven_trigger.toString());
-  if (config.position_size_pct !== undefined) params.set('position_size_pct', config.position_size_pct.toString());
-
-  const res = await fetch(`${API_BASE}/livebot/${eventTicker}/config?${params}`, {
+  const res = await fetch(`${API_BASE}/livebot/${eventTicker}/config`, {
     method: 'PUT',
-    credentials: 'include'
+    headers: { 'Content-Type': 'application/json' },
+    credentials: 'include',
+    body: JSON.stringify(config)
   });
   return res.json();
 }
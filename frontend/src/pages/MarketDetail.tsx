@@ -68,7 +68,7 @@ export function MarketDetail() {
   const wsUrl = import.meta.env.PROD
     ? `wss://${window.location.host}/ws`
     : `ws://${window.location.hostname}:8000/ws`;
-  const { lastMessage, isConnected } = useWebSocket(wsUrl);
+  const { messages, isConnected } = useWebSocket(wsUrl);
 
   // Initial data load
   useEffect(() => {
@@ -146,43 +146,45 @@ export function MarketDetail() {
 
   // Real-time WebSocket updates
   useEffect(() => {
-    if (!lastMessage || !ticker) return;
-
-    if (lastMessage.type === 'tick' && lastMessage.event_ticker === ticker) {
-      setTickData(prev => [...prev, lastMessage.data]);
-
-      // Update game state with latest tick
-      setGame(prev => ({
-        ...prev,
-        event_ticker: ticker,
-        home_team: lastMessage.data.home_team || prev?.home_team,
-        away_team: lastMessage.data.away_team || prev?.away_team,
-        home_price: lastMessage.data.home_price,
-        away_price: lastMessage.data.away_price,
-        home_score: lastMessage.data.home_score,
-        away_score: lastMessage.data.away_score,
-        quarter: lastMessage.data.quarter,
-        clock: lastMessage.data.clock,
-        status: lastMessage.data.status,
-        tick_count: (prev?.tick_count || 0) + 1
-      }));
-    }
+    if (!ticker) return;
 
-    // Update bot trades on trade events
-    if (
-      (lastMessage.type === 'live_bot_exit' || lastMessage.type === 'live_bot_entry') &&
-      lastMessage.event_ticker === ticker
-    ) {
-      // Refetch trades when new trade occurs
-      getBotTrades(ticker)
-        .then(response => {
-          if (response.trades) {
-            setBotTrades(response.trades);
-          }
-        })
-        .catch(err => console.error('Failed to update trades:', err));
+    for (const message of messages) {
+      if (message.type === 'tick' && message.event_ticker === ticker) {
+        setTickData(prev => [...prev, message.data]);
+
+        // Update game state with latest tick
+        setGame(prev => ({
+          ...prev,
+          event_ticker: ticker,
+          home_team: message.data.home_team || prev?.home_team,
+          away_team: message.data.away_team || prev?.away_team,
+          home_price: message.data.home_price,
+          away_price: message.data.away_price,
+          home_score: message.data.home_score,
+          away_score: message.data.away_score,
+          quarter: message.data.quarter,
+          clock: message.data.clock,
+          status: message.data.status,
+          tick_count: (prev?.tick_count || 0) + 1
+        }));
+      }
+
+      // Update bot trades on trade events
+      if (
+        (message.type === 'live_bot_exit' || message.type === 'live_bot_entry') &&
+        message.event_ticker === ticker
+      ) {
+        // Refetch trades when new trade occurs
+        getBotTrades(ticker)
+          .then(response => {
+            if (response.trades) {
+              setBotTrades(response.trades);
+            }
+          })
+          .catch(err => console.error('Failed to update trades:', err));
+      }
     }
-  }, [lastMessage, ticker]);
+  }, [messages, ticker]);
 
   // Share button handler
   const handleShare = () => {